@@ -53,6 +53,7 @@ class CodeGeneratorConfig(RoleConfig):
             False,
         )
         self.auto_plugin_selection_topk = self._get_int("auto_plugin_selection_topk", 3)
+        self.auto_plugin_selection_semantic_cache = self._get_bool("auto_plugin_selection_semantic_cache", False)
 
         self.use_experience = self._get_bool("use_experience", False)
 
@@ -100,7 +101,11 @@ class CodeGenerator(Role):
         self.compression_template = read_yaml(self.config.compression_prompt_path)["content"]
 
         if self.config.enable_auto_plugin_selection:
-            self.plugin_selector = PluginSelector(plugin_registry, self.llm_api)
+            self.plugin_selector = PluginSelector(
+                plugin_registry,
+                self.llm_api,
+                semantic_query_cache=self.config.auto_plugin_selection_semantic_cache,
+            )
             self.plugin_selector.load_plugin_embeddings()
             logger.info("Plugin embeddings loaded")
             self.selected_plugin_pool = SelectedPluginPool()
@@ -42,6 +42,7 @@ class CodeGeneratorPluginOnlyConfig(RoleConfig):
         )
         self.enable_auto_plugin_selection = self._get_bool("enable_auto_plugin_selection", False)
         self.auto_plugin_selection_topk = self._get_int("auto_plugin_selection_topk", 3)
+        self.auto_plugin_selection_semantic_cache = self._get_bool("auto_plugin_selection_semantic_cache", False)
 
         self.llm_alias = self._get_str("llm_alias", default="", required=False)
 
@@ -68,7 +69,11 @@ class CodeGeneratorPluginOnly(Role):
         self.instruction_template = self.prompt_data["content"]
 
         if self.config.enable_auto_plugin_selection:
-            self.plugin_selector = PluginSelector(plugin_registry, self.llm_api)
+            self.plugin_selector = PluginSelector(
+                plugin_registry,
+                self.llm_api,
+                semantic_query_cache=self.config.auto_plugin_selection_semantic_cache,
+            )
             self.plugin_selector.load_plugin_embeddings()
             logger.info("Plugin embeddings loaded")
             self.selected_plugin_pool = SelectedPluginPool()
@@ -1,15 +1,37 @@
+import glob
+import hashlib
 import os
-from typing import Dict, List
+from datetime import datetime, timedelta
+from typing import Any, List, Optional, Tuple
 
 import numpy as np
 from injector import inject
-from sklearn.metrics.pairwise import cosine_similarity
 
 from taskweaver.llm import LLMApi
 from taskweaver.memory.plugin import PluginEntry, PluginRegistry
 from taskweaver.utils import generate_md5_hash, write_yaml
 
 
+def normalize_embeddings(embeddings: np.ndarray) -> np.ndarray:
+    """
+    L2-normalize an embedding vector or each row of an embedding matrix,
+    so that cosine similarity reduces to a dot product.
+    """
+    norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+    return embeddings / np.where(norms == 0, 1, norms)
+
+
+def top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+    """
+    Return the indices of the `top_k` highest scores in descending order.
+    Uses a linear-time partition and only sorts the selected `top_k` candidates.
+    """
+    if top_k >= len(scores):
+        return np.argsort(-scores, kind="stable")
+    candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
 class SelectedPluginPool:
     def __init__(self):
         self.selected_plugin_pool = []
@@ -57,20 +79,163 @@ class SelectedPluginPool:
         return result
 
 
+class PluginEmbeddingCache:
+    """
+    Content-addressed on-disk cache of plugin embeddings.
+    Each embedding is stored as a float32 `.npy` file named after the hash of
+    the embedding model, plugin name and plugin description. At most
+    `max_entries` files are kept, the least recently used ones are removed first by `evict`.
+    """
+
+    def __init__(self, cache_dir: str, max_entries: int = 1024):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+
+    @staticmethod
+    def make_key(embedding_model: str, name: str, description: str) -> str:
+        return hashlib.sha256(f"{embedding_model}\0{name}\0{description}".encode()).hexdigest()
+
+    def _get_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.npy")
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        path = self._get_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            embedding = np.load(path)
+        except Exception:
+            # treat a corrupted cache file as a miss, it will be overwritten
+            return None
+        try:
+            # mark the entry as recently used so that it is evicted last
+            os.utime(path)
+        except OSError:
+            # e.g., a read-only cache directory, the entry is still usable
+            pass
+        return embedding
+
+    def put(self, key: str, embedding: List[float]) -> None:
+        if not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir)
+        np.save(self._get_path(key), np.asarray(embedding, dtype=np.float32))
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used entries beyond `max_entries`.
+        Called once after a batch of `put` calls, as it scans the whole cache directory.
+        """
+        entries: List[Tuple[float, str]] = []
+        for path in glob.glob(os.path.join(self.cache_dir, "*.npy")):
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except OSError:
+                # the file was removed after listing the directory
+                pass
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort()
+        for _, path in entries[: len(entries) - self.max_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class SemanticQueryCache:
+    """
+    Cache of plugin selection results keyed by normalized query embeddings.
+    A new query reuses the result of the most similar cached query if their
+    cosine similarity reaches `threshold`. The keys live in a preallocated
+    ring buffer of `max_size` rows, so the oldest entry is overwritten once
+    the cache is full; entries older than `ttl` are ignored.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.97,
+        max_size: int = 64,
+        ttl: Optional[timedelta] = None,
+    ):
+        self.threshold = threshold
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clear()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def clear(self):
+        # the key buffer is allocated on the first put, once the embedding dimension is known
+        self._keys: Optional[np.ndarray] = None
+        self._top_ks = np.zeros(self.max_size, dtype=np.int64)
+        self._timestamps: List[datetime] = [datetime.min] * self.max_size
+        self._values: List[List[PluginEntry]] = [[] for _ in range(self.max_size)]
+        self._size = 0
+        self._next = 0
+
+    def _match(self, query_embedding: np.ndarray, top_k: int) -> Optional[int]:
+        """
+        Return the slot of the most similar live entry that is within `threshold`
+        of the query and holds at least `top_k` plugins.
+        """
+        if self._size == 0 or self._keys is None or self._keys.shape[1] != query_embedding.shape[0]:
+            return None
+        similarities = self._keys[: self._size] @ query_embedding
+        candidates = (similarities >= self.threshold) & (self._top_ks[: self._size] >= top_k)
+        if self.ttl is not None:
+            deadline = datetime.now() - self.ttl
+            candidates &= np.asarray([t >= deadline for t in self._timestamps[: self._size]])
+        if not candidates.any():
+            return None
+        return int(np.argmax(np.where(candidates, similarities, -np.inf)))
+
+    def get(self, query_embedding: np.ndarray, top_k: int) -> Optional[List[PluginEntry]]:
+        slot = self._match(query_embedding, top_k)
+        if slot is None:
+            return None
+        return self._values[slot][:top_k]
+
+    def put(self, query_embedding: np.ndarray, top_k: int, selected_plugins: List[PluginEntry]):
+        if self.max_size <= 0:
+            return
+        if self._keys is None or self._keys.shape[1] != query_embedding.shape[0]:
+            self.clear()
+            self._keys = np.zeros((self.max_size, query_embedding.shape[0]), dtype=np.float32)
+
+        # refresh a near-duplicate entry in place instead of filling the buffer with copies of it
+        slot = self._match(query_embedding, 0)
+        if slot is None:
+            slot = self._next
+            self._next = (self._next + 1) % self.max_size
+            self._size = min(self._size + 1, self.max_size)
+        self._keys[slot] = query_embedding
+        self._top_ks[slot] = top_k
+        self._timestamps[slot] = datetime.now()
+        self._values[slot] = selected_plugins
+
+
 class PluginSelector:
+    # below this number of plugins a brute-force scan beats an approximate nearest neighbor index
+    ann_index_min_plugins: int = 64
+
     @inject
     def __init__(
         self,
         plugin_registry: PluginRegistry,
         llm_api: LLMApi,
         plugin_only: bool = False,
+        semantic_query_cache: bool = False,
     ):
         if plugin_only:
             self.available_plugins = [p for p in plugin_registry.get_list() if p.plugin_only is True]
         else:
             self.available_plugins = plugin_registry.get_list()
         self.llm_api = llm_api
-        self.plugin_embedding_dict: Dict[str, List[float]] = {}
+        # L2-normalized float32 embeddings, one row per plugin in `available_plugins`
+        self.plugin_embedding_matrix: np.ndarray = np.zeros((0, 0), dtype=np.float32)
+        # optional hnswlib index over `plugin_embedding_matrix` for large plugin sets
+        self.ann_index: Optional[Any] = None
 
         self.exception_message_for_refresh = (
             "Please cd to the `script` directory and "
@@ -80,31 +245,60 @@ class PluginSelector:
         self.meta_file_dir = os.path.join(os.path.dirname(plugin_registry.file_glob), ".meta")
         if not os.path.exists(self.meta_file_dir):
             os.makedirs(self.meta_file_dir)
+        self.embedding_cache = PluginEmbeddingCache(os.path.join(self.meta_file_dir, "embedding_cache"))
+        # reuse the selection of a near-identical earlier query, opt-in as it may change the selected plugins
+        self.query_cache: Optional[SemanticQueryCache] = (
+            SemanticQueryCache(ttl=plugin_registry.ttl) if semantic_query_cache else None
+        )
 
     def refresh(self):
-        plugins_to_embedded = []
-        for idx, p in enumerate(self.available_plugins):
+        embedding_model = self.llm_api.embedding_service.config.embedding_model
+        plugins_to_embedded: List[Tuple[PluginEntry, str, str]] = []
+        restored_count = 0
+        for p in self.available_plugins:
+            md5hash = generate_md5_hash(p.spec.name + p.spec.description)
             if (
                 len(p.meta_data.embedding) > 0
-                and p.meta_data.embedding_model == self.llm_api.embedding_service.config.embedding_model
-                and p.meta_data.md5hash == generate_md5_hash(p.spec.name + p.spec.description)
+                and p.meta_data.embedding_model == embedding_model
+                and p.meta_data.md5hash == md5hash
             ):
                 continue
-            else:
-                plugins_to_embedded.append((idx, p.name + ": " + p.spec.description))
+            cache_key = PluginEmbeddingCache.make_key(embedding_model, p.spec.name, p.spec.description)
+            cached_embedding = self.embedding_cache.get(cache_key)
+            if cached_embedding is not None:
+                self._update_plugin_embedding(p, cached_embedding.tolist(), embedding_model, md5hash)
+                restored_count += 1
+                continue
+            plugins_to_embedded.append((p, md5hash, cache_key))
 
+        if restored_count > 0:
+            print(f"Restored the embeddings of {restored_count} plugin(s) from the embedding cache.")
         if len(plugins_to_embedded) == 0:
-            print("All plugins are up-to-date.")
+            if restored_count == 0:
+                print("All plugins are up-to-date.")
             return
 
-        plugin_embeddings = self.llm_api.get_embedding_list([text for idx, text in plugins_to_embedded])
+        # embed all stale plugins with a single batched request instead of one request per plugin
+        plugin_embeddings = self.llm_api.get_embedding_list(
+            [p.name + ": " + p.spec.description for p, _, _ in plugins_to_embedded],
+        )
+
+        for (p, md5hash, cache_key), embedding in zip(plugins_to_embedded, plugin_embeddings):
+            self.embedding_cache.put(cache_key, embedding)
+            self._update_plugin_embedding(p, embedding, embedding_model, md5hash)
+        self.embedding_cache.evict()
 
-        for i, embedding in enumerate(plugin_embeddings):
-            p = self.available_plugins[plugins_to_embedded[i][0]]
-            p.meta_data.embedding = embedding
-            p.meta_data.embedding_model = self.llm_api.embedding_service.config.embedding_model
-            p.meta_data.md5hash = generate_md5_hash(p.spec.name + p.spec.description)
-            write_yaml(p.meta_data.path, p.meta_data.to_dict())
+    @staticmethod
+    def _update_plugin_embedding(
+        p: PluginEntry,
+        embedding: List[float],
+        embedding_model: str,
+        md5hash: str,
+    ):
+        p.meta_data.embedding = embedding
+        p.meta_data.embedding_model = embedding_model
+        p.meta_data.md5hash = md5hash
+        write_yaml(p.meta_data.path, p.meta_data.to_dict())
 
     def load_plugin_embeddings(self):
         for idx, p in enumerate(self.available_plugins):
@@ -125,32 +319,51 @@ class PluginSelector:
                 f"Plugin {p.name} has been modified. " + self.exception_message_for_refresh
             )
 
-            self.plugin_embedding_dict[p.name] = p.meta_data.embedding
+        if self.query_cache is not None:
+            self.query_cache.clear()
+        if len(self.available_plugins) > 0:
+            self.plugin_embedding_matrix = normalize_embeddings(
+                np.asarray([p.meta_data.embedding for p in self.available_plugins], dtype=np.float32),
+            )
+        self.ann_index = self._build_ann_index(self.plugin_embedding_matrix)
 
-    def plugin_select(self, user_query: str, top_k: int = 5) -> List[PluginEntry]:
-        user_query_embedding = np.array(self.llm_api.get_embedding(user_query))
+    def _build_ann_index(self, embeddings: np.ndarray) -> Optional[Any]:
+        if len(embeddings) < self.ann_index_min_plugins:
+            return None
+        try:
+            import hnswlib  # type: ignore
+        except ImportError:
+            # hnswlib is optional, fall back to the brute-force scan
+            return None
 
-        similarities = []
+        index = hnswlib.Index(space="cosine", dim=embeddings.shape[1])
+        index.init_index(max_elements=len(embeddings), ef_construction=100, M=16)
+        index.add_items(embeddings, np.arange(len(embeddings)))
+        return index
 
+    def plugin_select(self, user_query: str, top_k: int = 5) -> List[PluginEntry]:
         if top_k >= len(self.available_plugins):
             return self.available_plugins
 
-        for p in self.available_plugins:
-            similarity = cosine_similarity(
-                user_query_embedding.reshape(
-                    1,
-                    -1,
-                ),
-                np.array(self.plugin_embedding_dict[p.name]).reshape(1, -1),
-            )
-            similarities.append((p, similarity))
+        user_query_embedding = normalize_embeddings(
+            np.asarray(self.llm_api.get_embedding(user_query), dtype=np.float32),
+        )
 
-        plugins_rank = sorted(
-            similarities,
-            key=lambda x: x[1],
-            reverse=True,
-        )[:top_k]
+        if self.query_cache is not None:
+            cached_plugins = self.query_cache.get(user_query_embedding, top_k)
+            if cached_plugins is not None:
+                return cached_plugins
 
-        selected_plugins = [p for p, sim in plugins_rank]
+        if self.ann_index is not None:
+            self.ann_index.set_ef(max(top_k * 4, 32))
+            labels, _ = self.ann_index.knn_query(user_query_embedding.reshape(1, -1), k=top_k)
+            plugins_rank = labels[0]
+        else:
+            # cosine similarity against all plugins in a single matrix-vector product
+            similarities = self.plugin_embedding_matrix @ user_query_embedding
+            plugins_rank = top_k_indices(similarities, top_k)
+        selected_plugins = [self.available_plugins[i] for i in plugins_rank]
 
+        if self.query_cache is not None:
+            self.query_cache.put(user_query_embedding, top_k, selected_plugins)
         return selected_plugins
@@ -1,6 +1,9 @@
+import threading
 import types
+from collections import OrderedDict
 from typing import Any, Callable, Generator, List, Optional, Type
 
+import numpy as np
 from injector import Injector, Module, inject, provider
 
 from taskweaver.config.config_mgt import AppConfigSource
@@ -49,6 +52,10 @@ class LLMApi(object):
         self.injector = injector
         self.ext_llm_injector = Injector([])
         self.ext_llms = {}  # extra llm models
+        # LRU cache of single-string embeddings, e.g., user queries for plugin selection
+        # cached embeddings are kept as read-only float32 arrays rather than lists of boxed floats
+        self._embedding_cache: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._embedding_cache_lock = threading.Lock()
 
         if self.config.api_type in ["openai", "azure", "azure_ad"]:
             self._set_completion_service(OpenAIService)
@@ -375,7 +382,26 @@ class LLMApi(object):
                     pass
 
     def get_embedding(self, string: str) -> List[float]:
-        return self.embedding_service.get_embeddings([string])[0]
+        cache_size = self.config.embedding_cache_size
+        if cache_size <= 0:
+            return self.embedding_service.get_embeddings([string])[0]
+
+        with self._embedding_cache_lock:
+            cached = self._embedding_cache.get(string)
+            if cached is not None:
+                self._embedding_cache.move_to_end(string)
+                return cached.tolist()
+
+        embedding = np.asarray(self.embedding_service.get_embeddings([string])[0], dtype=np.float32)
+        embedding.setflags(write=False)
+
+        with self._embedding_cache_lock:
+            self._embedding_cache[string] = embedding
+            self._embedding_cache.move_to_end(string)
+            while len(self._embedding_cache) > cache_size:
+                self._embedding_cache.popitem(last=False)
+        # return the cached values on a miss as well, so that hits and misses agree exactly
+        return embedding.tolist()
 
     def get_embedding_list(self, strings: List[str]) -> List[List[float]]:
         return self.embedding_service.get_embeddings(strings)
@@ -65,6 +65,9 @@ class LLMModuleConfig(ModuleConfig):
 
         self.use_mock: bool = self._get_bool("use_mock", False)
 
+        # number of query embeddings kept in memory by `LLMApi.get_embedding`, 0 to disable
+        self.embedding_cache_size: int = self._get_int("embedding_cache_size", 4096)
+
 
 class LLMServiceConfig(ModuleConfig):
     @inject
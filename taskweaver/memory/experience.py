@@ -5,7 +5,6 @@ from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 from injector import inject
-from sklearn.metrics.pairwise import cosine_similarity
 
 from taskweaver.config.module_config import ModuleConfig
 from taskweaver.llm import LLMApi, format_chat_message
@@ -266,6 +265,9 @@ class ExperienceGenerator:
 
     @tracing_decorator
     def retrieve_experience(self, user_query: str) -> List[Tuple[Experience, float]]:
+        # imported lazily as scikit-learn is slow to import and only needed once experiences are retrieved
+        from sklearn.metrics.pairwise import cosine_similarity
+
         user_query_embedding = np.array(self.llm_api.get_embedding(user_query))
 
         similarities = []
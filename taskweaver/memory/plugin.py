@@ -1,4 +1,5 @@
 import os
+import sys
 from dataclasses import dataclass, field
 from datetime import timedelta
 from typing import Any, Dict, List, Optional, Tuple
@@ -9,6 +10,9 @@ from taskweaver.config.module_config import ModuleConfig
 from taskweaver.misc.component_registry import ComponentDisabledException, ComponentRegistry
 from taskweaver.utils import read_yaml, validate_yaml
 
+# type names in plugin yaml files that are rewritten to Python type names
+_TYPE_MAP = {"string": sys.intern("str"), "integer": sys.intern("int")}
+
 
 @dataclass
 class PluginMetaData:
@@ -47,27 +51,36 @@ class PluginParameter:
     required: bool = False
     description: Optional[str] = None
 
+    def __post_init__(self):
+        self.type = PluginParameter.normalize_type(self.type)
+
+    @property
+    def description_norm(self) -> str:
+        # description formatted as prompt comment lines
+        return (self.description or "").strip().replace("\n", "\n# ")
+
     @staticmethod
     def from_dict(d: Dict[str, Any]):
         return PluginParameter(
-            name=d["name"],
+            name=sys.intern(d["name"]),
             description=d["description"],
             required=d["required"] if "required" in d else False,
             type=d["type"] if "type" in d else "Any",
         )
 
-    def format_prompt(self, indent: int = 0) -> str:
-        lines: List[str] = []
-
-        def line(cnt: str):
-            lines.append(" " * indent + cnt)
-
-        line(f"- name: {self.name}")
-        line(f"  type: {self.type}")
-        line(f"  required: {self.required}")
-        line(f"  description: {self.description}")
+    @staticmethod
+    def normalize_type(t: str) -> str:
+        # type names repeat across plugins, so they are interned to share a single string object
+        return _TYPE_MAP.get(t.lower(), sys.intern(t))
 
-        return "\n".join(lines)
+    def format_prompt(self, indent: int = 0) -> str:
+        pad = " " * indent
+        return (
+            f"{pad}- name: {self.name}\n"
+            f"{pad}  type: {self.type}\n"
+            f"{pad}  required: {self.required}\n"
+            f"{pad}  description: {self.description}"
+        )
 
     def to_dict(self):
         return {
@@ -91,7 +104,7 @@ class PluginSpec:
     @staticmethod
     def from_dict(d: Dict[str, Any]):
         return PluginSpec(
-            name=d["name"],
+            name=sys.intern(d["name"]),
             description=d["description"],
             examples=d.get("examples", ""),
             args=[PluginParameter.from_dict(p) for p in d["parameters"]],
@@ -114,31 +127,9 @@ class PluginSpec:
         return plugin_description
 
     def format_prompt(self) -> str:
-        def normalize_type(t: str) -> str:
-            if t.lower() == "string":
-                return "str"
-            if t.lower() == "integer":
-                return "int"
-            return t
-
-        def normalize_description(d: str) -> str:
-            d = d.strip().replace("\n", "\n# ")
-            return d
-
-        def normalize_value(v: PluginParameter) -> PluginParameter:
-            return PluginParameter(
-                name=v.name,
-                type=normalize_type(v.type),
-                required=v.required,
-                description=normalize_description(v.description or ""),
-            )
-
         def format_arg_val(val: PluginParameter) -> str:
-            val = normalize_value(val)
             type_val = f"Optional[{val.type}]" if val.type != "Any" and not val.required else "Any"
-            if val.description is not None:
-                return f"\n# {val.description}\n{val.name}: {type_val}"
-            return f"{val.name}: {type_val}"
+            return f"\n# {val.description_norm}\n{val.name}: {type_val}"
 
         def format_examples(examples: str) -> str:
             return examples.strip().replace("\n", "\n# ")
@@ -152,17 +143,12 @@ class PluginSpec:
         if len(self.returns) > 1:
 
             def format_return_val(val: PluginParameter) -> str:
-                val = normalize_value(val)
-                if val.description is not None:
-                    return f"\n# {val.name}: {val.description}\n{val.type}"
-                return val.type
+                return f"\n# {val.name}: {val.description_norm}\n{val.type}"
 
             return_type = f"Tuple[{','.join([format_return_val(r) for r in self.returns])}]"
         elif len(self.returns) == 1:
-            rv = normalize_value(self.returns[0])
-            if rv.description is not None:
-                return_type = f"\\\n# {rv.name}: {rv.description}\n{rv.type}"
-            return_type = rv.type
+            rv = self.returns[0]
+            return_type = f"\\\n# {rv.name}: {rv.description_norm}\n{rv.type}" if rv.description else rv.type
         else:
             return_type = "None"
 
@@ -179,6 +165,8 @@ class PluginEntry:
     required: bool
     enabled: bool = True
     meta_data: Optional[PluginMetaData] = None
+    # the rendered prompt is cached as the spec does not change until the registry reloads the yaml file
+    _cached_prompt: Optional[str] = field(default=None, init=False, repr=False, compare=False)
 
     @staticmethod
     def from_yaml_file(path: str) -> Optional["PluginEntry"]:
@@ -213,7 +201,9 @@ class PluginEntry:
         return None
 
     def format_prompt(self) -> str:
-        return self.spec.format_prompt()
+        if self._cached_prompt is None:
+            self._cached_prompt = self.spec.format_prompt()
+        return self._cached_prompt
 
     def to_dict(self):
         return {
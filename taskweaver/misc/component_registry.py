@@ -82,6 +82,10 @@ class ComponentRegistry(ABC, Generic[component_type]):
     def __getitem__(self, name: str) -> Optional[component_type]:
         return self.get(name)
 
+    @property
+    def ttl(self) -> Optional[timedelta]:
+        return self._ttl
+
     @property
     def file_glob(self) -> str:
         return self._file_glob
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import dataclasses
+import functools
 import glob
 import importlib
 import inspect
@@ -10,7 +11,7 @@ import secrets
 import sys
 from datetime import datetime
 from hashlib import md5
-from typing import Any, Dict, List, Union
+from typing import Any, Callable, Dict, List, Union
 
 
 def create_id(length: int = 4) -> str:
@@ -22,9 +23,11 @@ def create_id(length: int = 4) -> str:
 def read_yaml(path: str) -> Dict[str, Any]:
     import yaml
 
+    # prefer the libyaml-backed loader when PyYAML is built with it
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
     try:
         with open(path, "r") as file:
-            return yaml.safe_load(file)
+            return yaml.load(file, Loader=loader)
     except Exception as e:
         raise ValueError(f"Yaml loading failed due to: {e}")
 
@@ -39,12 +42,8 @@ def write_yaml(path: str, content: Dict[str, Any]):
         raise ValueError(f"Yaml writing failed due to: {e}")
 
 
-def validate_yaml(content: Any, schema: str) -> bool:
-    import jsonschema
-
-    # plugin_dir = PLUGIN.BASE_PATH
-    # plugin_schema_path = os.path.join(plugin_dir, plugin_name + ".yaml")
-    # content = read_yaml(plugin_schema_path)
+@functools.lru_cache(maxsize=None)
+def _load_schema(schema: str) -> Any:
     assert schema in ["example_schema", "plugin_schema"]
     if schema == "example_schema":
         schema_path = os.path.join(os.path.dirname(__file__), "../plugin/taskweaver.conversation-v1.schema.json")
@@ -52,12 +51,41 @@ def validate_yaml(content: Any, schema: str) -> bool:
         schema_path = os.path.join(os.path.dirname(__file__), "../plugin/taskweaver.plugin-v1.schema.json")
 
     with open(schema_path) as file:
-        schema_object: Any = json.load(file)
+        return json.load(file)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_schema_validator(schema: str) -> Callable[[Any], None]:
+    # compile the validator once per schema, prefer fastjsonschema when it is installed
+    schema_object: Any = _load_schema(schema)
     try:
-        jsonschema.validate(content, schema=schema_object)
-        return True
-    except jsonschema.ValidationError as e:
-        raise ValueError(f"Yaml validation failed due to: {e}")
+        import fastjsonschema  # type: ignore
+
+        compiled_validate: Callable[[Any], Any] = fastjsonschema.compile(schema_object)
+        validation_error: Any = fastjsonschema.JsonSchemaException
+    except ImportError:
+        import jsonschema
+
+        validator_cls: Any = jsonschema.validators.validator_for(schema_object)
+        validator_cls.check_schema(schema_object)
+        compiled_validate = validator_cls(schema_object).validate
+        validation_error = jsonschema.ValidationError
+
+    def validate(content: Any) -> None:
+        try:
+            compiled_validate(content)
+        except validation_error as e:
+            raise ValueError(f"Yaml validation failed due to: {e}")
+
+    return validate
+
+
+def validate_yaml(content: Any, schema: str) -> bool:
+    # plugin_dir = PLUGIN.BASE_PATH
+    # plugin_schema_path = os.path.join(plugin_dir, plugin_name + ".yaml")
+    # content = read_yaml(plugin_schema_path)
+    _get_schema_validator(schema)(content)
+    return True
 
 
 class EnhancedJSONEncoder(json.JSONEncoder):
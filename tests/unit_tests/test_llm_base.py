@@ -1,4 +1,5 @@
 import json
+from typing import List
 
 import pytest
 from injector import Injector
@@ -80,3 +81,32 @@ def test_llm_output_format(
         recv_msg += chunk["content"]
 
     assert recv_msg == chat_response["content"]
+
+
+@pytest.mark.app_config(
+    {
+        "llm.use_mock": True,
+        "llm.mock.mode": "fixed",
+        "llm.embedding_cache_size": 2,
+    },
+)
+def test_llm_embedding_cache(app_injector: Injector):
+    api = app_injector.get(LLMApi)
+
+    embedded_strings: List[str] = []
+    get_embeddings = api.embedding_service.get_embeddings
+
+    def counting_get_embeddings(strings: List[str]) -> List[List[float]]:
+        embedded_strings.extend(strings)
+        return get_embeddings(strings)
+
+    api.embedding_service.get_embeddings = counting_get_embeddings  # type: ignore
+
+    embedding = api.get_embedding("query 1")
+    assert api.get_embedding("query 1") == embedding
+    assert embedded_strings == ["query 1"]
+
+    api.get_embedding("query 2")
+    api.get_embedding("query 3")  # evicts "query 1"
+    api.get_embedding("query 1")
+    assert embedded_strings == ["query 1", "query 2", "query 3", "query 1"]
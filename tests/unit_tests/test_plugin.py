@@ -4,7 +4,7 @@ from injector import Injector
 
 from taskweaver.config.config_mgt import AppConfigSource
 from taskweaver.logging import LoggingModule
-from taskweaver.memory.plugin import PluginModule, PluginRegistry
+from taskweaver.memory.plugin import PluginEntry, PluginModule, PluginParameter, PluginRegistry, PluginSpec
 
 
 def test_load_plugin_yaml():
@@ -112,3 +112,82 @@ def test_plugin_format_prompt():
         "# description: This is a string describing the anomaly detection results.\n"
         "str]:...\n"
     )
+
+
+def test_plugin_format_prompt_cached():
+    entry = PluginEntry.from_yaml_content(
+        {
+            "name": "tell_joke",
+            "description": "Call this plugin to tell a joke.",
+            "parameters": [],
+            "returns": [],
+        },
+    )
+    assert entry is not None
+
+    prompt = entry.format_prompt()
+    assert prompt == "# Call this plugin to tell a joke.\ndef tell_joke() -> None:...\n"
+    assert entry.format_prompt() is prompt
+
+
+def test_plugin_parameter_format_prompt():
+    param = PluginParameter(name="size", type="int", required=False, description="number of products to return")
+    assert param.format_prompt(indent=2) == (
+        "  - name: size\n" "    type: int\n" "    required: False\n" "    description: number of products to return"
+    )
+
+
+def test_plugin_format_prompt_single_return():
+    spec = PluginSpec.from_dict(
+        {
+            "name": "paper_summary",
+            "description": "Summarize a paper.",
+            "parameters": [
+                {"name": "paper_file_path", "type": "string", "required": True, "description": "path to the paper"},
+            ],
+            "returns": [
+                {"name": "summary", "type": "string", "description": "The final summary of the paper."},
+            ],
+        },
+    )
+    assert spec.format_prompt() == (
+        "# Summarize a paper.\n"
+        "def paper_summary(\n"
+        "# path to the paper\n"
+        "paper_file_path: Any) -> \\\n"
+        "# summary: The final summary of the paper.\n"
+        "str:...\n"
+    )
+
+    spec.returns[0].description = None
+    assert spec.format_prompt().endswith("paper_file_path: Any) -> str:...\n")
+
+
+def test_plugin_parameter_type_normalized():
+    string_param = PluginParameter.from_dict({"name": "query", "type": "String", "description": "the query"})
+    int_param = PluginParameter.from_dict({"name": "size", "type": "integer", "description": "the size"})
+    other_param = PluginParameter.from_dict({"name": "df", "type": "DataFrame", "description": "the data"})
+
+    assert string_param.type == "str"
+    assert int_param.type == "int"
+    assert other_param.type == "DataFrame"
+    assert other_param.type is PluginParameter.normalize_type("".join(["Data", "Frame"]))
+
+    # directly constructed parameters are normalized as well
+    param = PluginParameter(name="query", type="string", required=True, description="the query")
+    assert param.type == "str"
+
+
+def test_plugin_description_uses_normalized_types():
+    spec = PluginSpec.from_dict(
+        {
+            "name": "klarna_search",
+            "description": "Search products.",
+            "parameters": [
+                {"name": "query", "type": "string", "required": True, "description": "the query"},
+                {"name": "size", "type": "integer", "required": False, "description": "number of products"},
+            ],
+            "returns": [],
+        },
+    )
+    assert spec.plugin_description() == "- klarna_search: Search products. Arguments required: query: str\n"
@@ -1,11 +1,23 @@
+import glob
 import os
+import shutil
+from datetime import timedelta
+from types import SimpleNamespace
 
+import numpy as np
 import pytest
 from injector import Injector
 
-from taskweaver.code_interpreter.plugin_selection import PluginSelector
+from taskweaver.code_interpreter.plugin_selection import (
+    PluginEmbeddingCache,
+    PluginSelector,
+    SemanticQueryCache,
+    normalize_embeddings,
+    top_k_indices,
+)
 from taskweaver.config.config_mgt import AppConfigSource
-from taskweaver.memory.plugin import PluginModule
+from taskweaver.memory.plugin import PluginModule, PluginRegistry
+from taskweaver.utils import generate_md5_hash
 
 IN_GITHUB_ACTIONS = os.getenv("GITHUB_ACTIONS") == "true"
 
@@ -37,3 +49,131 @@ def test_plugin_selector():
     selected_plugins = plugin_selector.plugin_select(query2, top_k=3)
 
     assert any([p.name == "paper_summary" for p in selected_plugins])
+
+
+def test_plugin_selector_ann_index(tmp_path):
+    pytest.importorskip("hnswlib")
+    plugin_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data/plugins")
+    for path in glob.glob(os.path.join(plugin_dir, "*.yaml")):
+        shutil.copy(path, tmp_path)
+
+    rng = np.random.default_rng(0)
+    query_embeddings = {"query1": rng.standard_normal(16).tolist(), "query2": rng.standard_normal(16).tolist()}
+    llm_api = SimpleNamespace(
+        embedding_service=SimpleNamespace(config=SimpleNamespace(embedding_model="test_model")),
+        get_embedding=lambda query: query_embeddings[query],
+    )
+    plugin_registry = PluginRegistry(file_glob=os.path.join(str(tmp_path), "*.yaml"))
+    plugin_selector = PluginSelector(plugin_registry, llm_api)  # type: ignore
+    for p in plugin_selector.available_plugins:
+        p.meta_data.embedding = rng.standard_normal(16).tolist()
+        p.meta_data.embedding_model = "test_model"
+        p.meta_data.md5hash = generate_md5_hash(p.spec.name + p.spec.description)
+
+    plugin_selector.load_plugin_embeddings()
+    assert plugin_selector.ann_index is None
+    brute_force = {q: plugin_selector.plugin_select(q, top_k=2) for q in query_embeddings}
+
+    plugin_selector.ann_index_min_plugins = 1
+    plugin_selector.load_plugin_embeddings()
+    assert plugin_selector.ann_index is not None
+    for q in query_embeddings:
+        assert [p.name for p in plugin_selector.plugin_select(q, top_k=2)] == [p.name for p in brute_force[q]]
+
+
+def test_plugin_embedding_cache(tmp_path):
+    cache = PluginEmbeddingCache(str(tmp_path / "embedding_cache"))
+
+    key = PluginEmbeddingCache.make_key("all-mpnet-base-v2", "anomaly_detection", "detect anomalies")
+    assert key != PluginEmbeddingCache.make_key("all-MiniLM-L12-v2", "anomaly_detection", "detect anomalies")
+    assert cache.get(key) is None
+
+    cache.put(key, [0.1, 0.2, 0.3])
+    embedding = cache.get(key)
+    assert embedding is not None
+    assert embedding.dtype == "float32"
+    assert embedding.tolist() == pytest.approx([0.1, 0.2, 0.3])
+
+
+def test_plugin_embedding_cache_eviction(tmp_path):
+    cache = PluginEmbeddingCache(str(tmp_path / "embedding_cache"), max_entries=2)
+    keys = [PluginEmbeddingCache.make_key("all-mpnet-base-v2", name, "") for name in ["a", "b", "c"]]
+
+    cache.put(keys[0], [0.1])
+    cache.put(keys[1], [0.2])
+    # make the first entry the least recently used one, regardless of the file system timestamp resolution
+    os.utime(cache._get_path(keys[1]), (0, 0))
+    assert cache.get(keys[0]) is not None
+
+    cache.put(keys[2], [0.3])
+    assert len(os.listdir(cache.cache_dir)) == 3
+    cache.evict()
+    assert len(os.listdir(cache.cache_dir)) == 2
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[2]) is not None
+
+
+def test_normalize_embeddings():
+    matrix = normalize_embeddings(np.asarray([[3.0, 4.0], [0.0, 0.0]], dtype=np.float32))
+    assert matrix[0].tolist() == pytest.approx([0.6, 0.8])
+    assert matrix[1].tolist() == [0.0, 0.0]
+
+    vector = normalize_embeddings(np.asarray([0.0, 2.0], dtype=np.float32))
+    assert vector.tolist() == [0.0, 1.0]
+
+
+def test_top_k_indices():
+    scores = np.asarray([0.1, 0.9, 0.3, 0.7, 0.5], dtype=np.float32)
+    assert top_k_indices(scores, 1).tolist() == [1]
+    assert top_k_indices(scores, 3).tolist() == [1, 3, 4]
+    assert top_k_indices(scores, 10).tolist() == [1, 3, 4, 2, 0]
+
+
+def test_semantic_query_cache():
+    cache = SemanticQueryCache(threshold=0.97, max_size=2)
+    query1 = normalize_embeddings(np.asarray([1.0, 0.0, 0.0], dtype=np.float32))
+    assert cache.get(query1, top_k=2) is None
+
+    cache.put(query1, 2, ["anomaly_detection", "sql_pull_data"])
+    assert cache.get(query1, top_k=2) == ["anomaly_detection", "sql_pull_data"]
+    assert cache.get(query1, top_k=1) == ["anomaly_detection"]
+    # the cached result is too short for a larger top_k
+    assert cache.get(query1, top_k=3) is None
+
+    # a near-duplicate query hits, an unrelated one misses
+    assert cache.get(normalize_embeddings(np.asarray([1.0, 0.1, 0.0], dtype=np.float32)), top_k=2) is not None
+    query2 = normalize_embeddings(np.asarray([0.0, 1.0, 0.0], dtype=np.float32))
+    assert cache.get(query2, top_k=2) is None
+
+    # the oldest slot of the ring buffer is overwritten once the cache is full
+    cache.put(query2, 2, ["paper_summary", "klarna_search"])
+    cache.put(normalize_embeddings(np.asarray([0.0, 0.0, 1.0], dtype=np.float32)), 2, ["klarna_search"])
+    assert len(cache) == 2
+    assert cache.get(query1, top_k=2) is None
+    assert cache.get(query2, top_k=2) == ["paper_summary", "klarna_search"]
+
+    # a near-duplicate query replaces the existing entry instead of taking a new slot
+    cache.put(query2, 3, ["paper_summary", "klarna_search", "sql_pull_data"])
+    assert len(cache) == 2
+    assert cache.get(query2, top_k=3) == ["paper_summary", "klarna_search", "sql_pull_data"]
+
+
+def test_semantic_query_cache_checks_all_matches():
+    cache = SemanticQueryCache(threshold=0.97, max_size=4)
+    query = normalize_embeddings(np.asarray([1.0, 0.0, 0.0], dtype=np.float32))
+    close = normalize_embeddings(np.asarray([1.0, 0.2, 0.0], dtype=np.float32))
+    cache.put(close, 3, ["anomaly_detection", "sql_pull_data", "klarna_search"])
+    cache.threshold = 0.999
+    cache.put(query, 1, ["anomaly_detection"])
+    cache.threshold = 0.97
+
+    # the most similar entry only holds one plugin, so the other entry within the threshold is used
+    assert cache.get(query, top_k=2) == ["anomaly_detection", "sql_pull_data"]
+
+
+def test_semantic_query_cache_ttl():
+    cache = SemanticQueryCache(threshold=0.97, max_size=2, ttl=timedelta(seconds=-1))
+    query = normalize_embeddings(np.asarray([1.0, 0.0, 0.0], dtype=np.float32))
+    cache.put(query, 2, ["anomaly_detection", "sql_pull_data"])
+    assert cache.get(query, top_k=2) is None
@@ -0,0 +1,51 @@
+import sys
+from typing import Any, List
+
+import pytest
+
+import taskweaver.utils as utils
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"name": {"type": "string"}},
+    "required": ["name"],
+}
+
+
+@pytest.fixture()
+def loaded_schemas(monkeypatch: pytest.MonkeyPatch):
+    loaded: List[str] = []
+
+    def load_schema(schema: str) -> Any:
+        loaded.append(schema)
+        return SCHEMA
+
+    utils._get_schema_validator.cache_clear()
+    monkeypatch.setattr(utils, "_load_schema", load_schema)
+    yield loaded
+    utils._get_schema_validator.cache_clear()
+
+
+def check_validate_yaml(loaded: List[str]):
+    assert utils.validate_yaml({"name": "klarna_search"}, schema="plugin_schema")
+    with pytest.raises(ValueError):
+        utils.validate_yaml({"name": 1}, schema="plugin_schema")
+    with pytest.raises(ValueError):
+        utils.validate_yaml({}, schema="plugin_schema")
+    assert utils.validate_yaml({"name": "paper_summary"}, schema="plugin_schema")
+
+    # the validator is built only once per schema
+    assert loaded == ["plugin_schema"]
+    utils.validate_yaml({"name": "anomaly_detection"}, schema="example_schema")
+    assert loaded == ["plugin_schema", "example_schema"]
+
+
+def test_validate_yaml_jsonschema(loaded_schemas: List[str], monkeypatch: pytest.MonkeyPatch):
+    # make `import fastjsonschema` fail so that the jsonschema fallback is used
+    monkeypatch.setitem(sys.modules, "fastjsonschema", None)  # type: ignore
+    check_validate_yaml(loaded_schemas)
+
+
+def test_validate_yaml_fastjsonschema(loaded_schemas: List[str]):
+    pytest.importorskip("fastjsonschema")
+    check_validate_yaml(loaded_schemas)